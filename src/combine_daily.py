@@ -28,6 +28,7 @@ def main(argv=None) -> int:
     ap.add_argument("--drift", required=True)
     ap.add_argument("--hl", required=True)
     ap.add_argument("--dydx", required=True)
+    ap.add_argument("--depth", default=None, help="Optional depth JSON from depth_collect")
     ap.add_argument("--out-csv", required=True)
     ap.add_argument("--out-json", default=None)
     ap.add_argument("--daily-snapshot", required=True)
@@ -39,6 +40,16 @@ def main(argv=None) -> int:
     rows += load_rows_or_placeholders(args.hl, base_dir, "hyperliquid", args.daily_snapshot)
     rows += load_rows_or_placeholders(args.dydx, base_dir, "dydx", args.daily_snapshot)
 
+    # optional order-book depth, joined on (exchange, symbol_raw)
+    if args.depth and os.path.exists(args.depth):
+        try:
+            depth = {(str(d.get("exchange","")), str(d.get("symbol_raw",""))): d.get("depth_1pct_usd", "")
+                     for d in read_json(args.depth)}
+        except Exception:
+            depth = {}
+        for r in rows:
+            r["depth_1pct_usd"] = depth.get((str(r.get("exchange","")), str(r.get("symbol_raw",""))), "")
+
     # deterministic sort
     rows.sort(key=lambda r: (str(r.get("exchange","")), str(r.get("symbol_raw",""))))
 
@@ -2,7 +2,7 @@
 """
 File IO utilities: atomic writes, symbol registry, history append with dedupe.
 """
-import os, json, tempfile, shutil, csv
+import os, io, json, tempfile, shutil, csv
 from typing import List, Dict, Tuple
 from .schema import CSV_FIELDS
 
@@ -47,18 +47,29 @@ def write_symbol_registry(base_dir: str, exchange: str, symbols: List[str]):
     write_json(registry_path(base_dir, exchange), {"symbols": unique})
 
 # ---- history append with dedupe on (date, exchange, symbol) ----
-def append_history_rows(history_dir: str, snapshot_date: str, rows: List[Dict]):
+def append_history_rows(history_dir: str, snapshot_date: str, rows: List[Dict],
+                        fields: List[str] = CSV_FIELDS, prefix: str = "metrics"):
     ensure_dir(history_dir)
     year = snapshot_date[:4]
-    path = os.path.join(history_dir, f"metrics_{year}.csv")
+    path = os.path.join(history_dir, f"{prefix}_{year}.csv")
 
     existing_keys = set()
     if os.path.exists(path):
         with open(path, "r", encoding="utf-8") as f:
             rdr = csv.DictReader(f)
-            for r in rdr:
-                k = (r.get("daily_snapshot",""), r.get("exchange","").lower(), r.get("symbol_raw","").upper())
-                existing_keys.add(k)
+            old_rows = list(rdr)
+            header = rdr.fieldnames or []
+        for r in old_rows:
+            k = (r.get("daily_snapshot",""), r.get("exchange","").lower(), r.get("symbol_raw","").upper())
+            existing_keys.add(k)
+        # schema grew (e.g. new column) → rewrite once with the current header
+        if header != list(fields):
+            buf = io.StringIO(newline="")
+            w = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+            w.writeheader()
+            for r in old_rows:
+                w.writerow({k: r.get(k, "") or "" for k in fields})
+            atomic_write_text(path, buf.getvalue())
 
     # filter to non-duplicates
     to_write = []
@@ -69,8 +80,8 @@ def append_history_rows(history_dir: str, snapshot_date: str, rows: List[Dict]):
 
     mode = "a" if os.path.exists(path) else "w"
     with open(path, mode, newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w = csv.DictWriter(f, fieldnames=fields)
         if mode == "w":
             w.writeheader()
         for r in to_write:
-            w.writerow({k: r.get(k, "") for k in CSV_FIELDS})
+            w.writerow({k: r.get(k, "") for k in fields})
@@ -5,6 +5,7 @@ HTTP helpers with small retry/backoff.
 import time, random, requests
 
 UA = "dex-snap/1.0 (+snapshots)"
+BACKOFF = (0.4, 1.6)   # seconds, uniform jitter between retries
 
 def make_session(timeout=(10, 20)) -> requests.Session:
     s = requests.Session()
@@ -19,7 +20,7 @@ def _wrap_with_timeout(fn, timeout):
         return fn(method, url, **kw)
     return inner
 
-def get_json(url, session=None, retries=2, backoff=(0.4, 1.6)):
+def get_json(url, session=None, retries=2, backoff=BACKOFF):
     s = session or make_session()
     last = None
     for i in range(retries + 1):
@@ -34,7 +35,7 @@ def get_json(url, session=None, retries=2, backoff=(0.4, 1.6)):
             time.sleep(random.uniform(*backoff))
     raise RuntimeError(f"GET {url} failed: {last}")
 
-def post_json(url, payload, session=None, retries=2, backoff=(0.4, 1.6)):
+def post_json(url, payload, session=None, retries=2, backoff=BACKOFF):
     s = session or make_session()
     last = None
     for i in range(retries + 1):
@@ -18,6 +18,7 @@ def make_placeholders(exchange: str, symbols: List[str], daily_snapshot: str) ->
             "volume_24h_usd": 0.0,          # explicit zeros per policy
             "open_interest_base": 0.0,
             "open_interest_usd": 0.0,
+            "depth_1pct_usd": "",           # unknown
             "daily_snapshot": daily_snapshot,
         })
     return rows
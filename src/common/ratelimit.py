@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Async token-bucket rate limiter (one bucket per venue).
+"""
+import asyncio, time
+
+class TokenBucket:
+    """
+    `rate` tokens/sec refill, up to `burst` tokens banked.
+    `await bucket.acquire()` blocks until a token is available.
+    Default burst=1 makes `rate` a hard cap (no initial/idle burst); raise it
+    only if the venue tolerates short bursts above `rate`.
+    """
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    async def acquire(self, tokens: float = 1.0):
+        # lock keeps waiters FIFO so higher-priority requests queued first go first
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
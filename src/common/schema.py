@@ -13,9 +13,22 @@ CSV_FIELDS = [
     "volume_24h_usd",
     "open_interest_base",
     "open_interest_usd",
+    "depth_1pct_usd",
     "daily_snapshot",
 ]
 
+# ---- Cross-venue divergence artifact ----
+EXCHANGES = ["drift", "dydx", "hyperliquid"]
+EXCHANGE_PAIRS = [(a, b) for i, a in enumerate(EXCHANGES) for b in EXCHANGES[i + 1:]]
+
+DIVERGENCE_FIELDS = (
+    ["symbol_raw", "venues", "ref_price_usd"]
+    + [f"price_{ex}" for ex in EXCHANGES]
+    + [f"basis_bps_{ex}" for ex in EXCHANGES]
+    + [f"div_bps_{a}_{b}" for a, b in EXCHANGE_PAIRS]
+    + ["max_abs_div_bps", "daily_snapshot"]
+)
+
 def normalize_symbol(sym: str) -> str:
     s = (sym or "").strip().upper()
     # force -USD suffix if missing
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Optional order-book depth collector → depth rows (exchange, symbol_raw, depth_1pct_usd).
+
+Reads the collector JSONs, then fetches one order book per market
+(HL names are case-sensitive, e.g. kPEPE, so they are resolved from /info meta):
+- Hyperliquid: POST /info {"type": "l2Book", "coin": ..., "nSigFigs": 3}
+- dYdX:        GET  {indexer}/v4/orderbooks/perpetualMarket/{ticker}
+
+Rules:
+- depth_1pct_usd = Σ px*sz of bids with px >= mid*(1-1%) + asks with px <= mid*(1+1%)
+- HL caps l2Book at 20 levels/side; at full tick precision that is a few bps on
+  liquid markets, so levels are aggregated to 3 significant figures (≥ ~2% of
+  mid). If a capped side still ends inside the band the value is "" (truncated)
+  rather than an undercount. dYdX returns the full book and is never capped.
+- markets are fetched highest 24h volume first (across venues) by a bounded
+  pool of workers; each venue has its own token bucket (burst 1, so the
+  rps flags are hard caps) and every attempt (retries included) takes a token;
+  a failed request is retried once after the net.py backoff
+- when `--deadline` passes, no new requests start; unfetched markets are left out
+  (combiner emits "" for them)
+
+Drift is not covered (no per-market book endpoint in our current API).
+Base URLs are flags so the stage can run against a local mock server.
+"""
+import argparse, asyncio, datetime as dt, os, random, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from .common.io_utils import read_json, write_json
+from .common.net import get_json, post_json, make_session, BACKOFF
+from .common.ratelimit import TokenBucket
+
+HL_INFO_URL = "https://api.hyperliquid.xyz/info"
+DYDX_INDEXER = "https://indexer.dydx.trade"
+DEPTH_PCT = 0.01
+HL_SIG_FIGS = 3
+HL_MAX_LEVELS = 20
+MAX_RETRIES = 1
+
+Levels = List[Tuple[float, float]]   # [(px, sz), ...]
+
+# ========= book math =========
+def is_truncated(bids: Levels, asks: Levels, pct: float = DEPTH_PCT,
+                 max_levels: Optional[int] = None) -> bool:
+    """True if a side hit the venue's level cap while its deepest level is still inside ±pct."""
+    if not max_levels or not bids or not asks:
+        return False
+    mid = (max(p for p, _ in bids) + min(p for p, _ in asks)) / 2.0
+    lo, hi = mid * (1.0 - pct), mid * (1.0 + pct)
+    return ((len(bids) >= max_levels and min(p for p, _ in bids) >= lo)
+            or (len(asks) >= max_levels and max(p for p, _ in asks) <= hi))
+
+def depth_within(bids: Levels, asks: Levels, pct: float = DEPTH_PCT,
+                 max_levels: Optional[int] = None) -> Optional[float]:
+    """USD notional resting within ±pct of mid; None if either side is empty or truncated."""
+    if not bids or not asks or is_truncated(bids, asks, pct, max_levels):
+        return None
+    mid = (max(p for p, _ in bids) + min(p for p, _ in asks)) / 2.0
+    lo, hi = mid * (1.0 - pct), mid * (1.0 + pct)
+    return (sum(p * s for p, s in bids if p >= lo)
+            + sum(p * s for p, s in asks if p <= hi))
+
+def _levels(side, px_key: str, sz_key: str) -> Levels:
+    out = []
+    for lvl in side or []:
+        try:
+            out.append((float(lvl[px_key]), float(lvl[sz_key])))
+        except Exception:
+            continue
+    return out
+
+def parse_hl_book(js) -> Tuple[Levels, Levels]:
+    # HL returns { coin, time, levels: [ [bids...], [asks...] ] } with {px, sz, n}
+    levels = js.get("levels", []) if isinstance(js, dict) else []
+    bids = levels[0] if len(levels) > 0 else []
+    asks = levels[1] if len(levels) > 1 else []
+    return _levels(bids, "px", "sz"), _levels(asks, "px", "sz")
+
+def parse_dydx_book(js) -> Tuple[Levels, Levels]:
+    # indexer returns { bids: [{price, size}], asks: [{price, size}] }
+    if not isinstance(js, dict):
+        return [], []
+    return _levels(js.get("bids"), "price", "size"), _levels(js.get("asks"), "price", "size")
+
+# ========= job list =========
+def _vol(r: Dict[str, Any]) -> float:
+    try:
+        return float(r.get("volume_24h_usd") or 0.0)
+    except Exception:
+        return 0.0
+
+def build_jobs(hl_rows: List[Dict], dydx_rows: List[Dict]) -> List[Dict[str, Any]]:
+    """One job per market, sorted by 24h volume (desc) so top markets go first."""
+    jobs = []
+    for r in hl_rows:
+        sym = str(r.get("symbol_raw", ""))
+        coin = sym.rsplit("-USD", 1)[0]   # upper-cased; resolved via fetch_hl_names
+        if sym and coin:
+            jobs.append({"exchange": "hyperliquid", "symbol_raw": sym, "key": coin, "vol": _vol(r)})
+    for r in dydx_rows:
+        sym = str(r.get("symbol_raw", ""))
+        if sym:
+            jobs.append({"exchange": "dydx", "symbol_raw": sym, "key": sym, "vol": _vol(r)})
+    jobs.sort(key=lambda j: (-j["vol"], j["exchange"], j["symbol_raw"]))
+    return jobs
+
+def fetch_hl_names(hl_url: str, session=None) -> Dict[str, str]:
+    """UPPER → case-sensitive HL coin name (e.g. KPEPE → kPEPE) from /info meta."""
+    js = post_json(hl_url, {"type": "meta"}, session=session, retries=0)
+    uni = js.get("universe", []) if isinstance(js, dict) else []
+    return {str(u.get("name", "")).upper(): str(u.get("name", "")) for u in uni if u.get("name")}
+
+# ========= async fetch =========
+async def collect(jobs: List[Dict[str, Any]], hl_url: str, indexer_url: str,
+                  concurrency: int = 8, hl_rps: float = 8.0, dydx_rps: float = 10.0,
+                  deadline_s: float = 120.0) -> List[Dict[str, Any]]:
+    sessions = {"hyperliquid": make_session(), "dydx": make_session()}
+    buckets = {"hyperliquid": TokenBucket(hl_rps), "dydx": TokenBucket(dydx_rps)}
+    indexer_url = indexer_url.rstrip("/")
+    # own pool, one thread per worker: with the default executor (cpu+4 threads) fetches
+    # could queue after taking a token and then go out in a burst above the rate cap
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    hl_jobs = [j for j in jobs if j["exchange"] == "hyperliquid"]
+    if hl_jobs:
+        await buckets["hyperliquid"].acquire()
+        try:
+            names = await loop.run_in_executor(pool, fetch_hl_names, hl_url, sessions["hyperliquid"])
+        except Exception as e:
+            names = {}
+            print(f"[depth][warn] hyperliquid meta: {e} (using upper-cased names)")
+        for j in hl_jobs:
+            j["key"] = names.get(j["key"], j["key"])
+
+    def fetch(job) -> Tuple[Levels, Levels]:
+        if job["exchange"] == "hyperliquid":
+            js = post_json(hl_url, {"type": "l2Book", "coin": job["key"], "nSigFigs": HL_SIG_FIGS},
+                           session=sessions["hyperliquid"], retries=0)
+            return parse_hl_book(js)
+        js = get_json(f"{indexer_url}/v4/orderbooks/perpetualMarket/{job['key']}",
+                      session=sessions["dydx"], retries=0)
+        return parse_dydx_book(js)
+
+    # (rank, attempt, job): a retried job keeps its volume rank, so it goes back near the front
+    queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    for rank, j in enumerate(jobs):
+        queue.put_nowait((rank, 0, j))
+    stop_at = time.monotonic() + deadline_s
+    out: List[Dict[str, Any]] = []
+    failed = dropped = truncated = 0
+
+    async def worker():
+        nonlocal failed, dropped, truncated
+        while time.monotonic() < stop_at:
+            try:
+                rank, attempt, job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await buckets[job["exchange"]].acquire()
+            if time.monotonic() >= stop_at:
+                dropped += 1
+                return
+            try:
+                bids, asks = await loop.run_in_executor(pool, fetch, job)
+            except Exception as e:
+                # no in-thread retries: back off, then re-queue so the retry takes its own token
+                if attempt < MAX_RETRIES:
+                    await asyncio.sleep(random.uniform(*BACKOFF))
+                    queue.put_nowait((rank, attempt + 1, job))
+                    continue
+                failed += 1
+                print(f"[depth][warn] {job['exchange']} {job['symbol_raw']}: {e}")
+                continue
+            cap = HL_MAX_LEVELS if job["exchange"] == "hyperliquid" else None
+            if is_truncated(bids, asks, max_levels=cap):
+                truncated += 1
+                print(f"[depth][warn] {job['exchange']} {job['symbol_raw']}: book truncated inside ±{DEPTH_PCT:.0%}")
+            depth = depth_within(bids, asks, max_levels=cap)
+            out.append({
+                "exchange": job["exchange"],
+                "symbol_raw": job["symbol_raw"],
+                "depth_1pct_usd": depth if depth is not None else "",
+            })
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        pool.shutdown(wait=False)
+    skipped = queue.qsize() + dropped
+    print(f"[depth] fetched={len(out)} failed={failed} truncated={truncated} skipped_by_deadline={skipped}")
+    out.sort(key=lambda r: (r["exchange"], r["symbol_raw"]))
+    return out
+
+# ========= CLI / main =========
+def _rows(path: Optional[str]) -> List[Dict]:
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        js = read_json(path)
+        return js if isinstance(js, list) else []
+    except Exception:
+        return []
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Per-market order-book depth (±1%) for HL + dYdX.")
+    ap.add_argument("--hl", default=None, help="hyperliquid_latest.json from hl_collect")
+    ap.add_argument("--dydx", default=None, help="dydx_latest.json from dydx_collect")
+    ap.add_argument("--out", required=True, help="Output JSON path")
+    ap.add_argument("--daily-snapshot", default=dt.datetime.utcnow().date().isoformat(), help="YYYY-MM-DD (UTC)")
+    ap.add_argument("--hl-url", default=HL_INFO_URL, help="Hyperliquid /info endpoint")
+    ap.add_argument("--indexer", default=DYDX_INDEXER, help="dYdX indexer REST base")
+    ap.add_argument("--concurrency", type=int, default=8, help="Max in-flight requests")
+    ap.add_argument("--hl-rps", type=float, default=8.0, help="Hyperliquid requests/sec")
+    ap.add_argument("--dydx-rps", type=float, default=10.0, help="dYdX requests/sec")
+    ap.add_argument("--deadline", type=float, default=120.0, help="Seconds before no new requests start")
+    ap.add_argument("--limit", type=int, default=0, help="Only the top-N markets by volume (0 = all)")
+    args = ap.parse_args(argv)
+
+    jobs = build_jobs(_rows(args.hl), _rows(args.dydx))
+    if args.limit > 0:
+        jobs = jobs[:args.limit]
+
+    rows = asyncio.run(collect(jobs, args.hl_url, args.indexer,
+                               concurrency=args.concurrency, hl_rps=args.hl_rps,
+                               dydx_rps=args.dydx_rps, deadline_s=args.deadline))
+    for r in rows:
+        r["daily_snapshot"] = args.daily_snapshot
+
+    write_json(args.out, rows)
+    print(f"[depth] rows={len(rows)} → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
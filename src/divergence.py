@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-venue price divergence: combined CSV -> per-symbol divergence CSV (+optional JSON).
+
+All venues are aligned on `symbol_raw` into a (symbols x exchanges) price
+matrix and every metric is computed in one vectorized NumPy pass:
+- ref_price_usd       = volume-weighted price across venues quoting the symbol
+                        (plain mean when no venue reports volume)
+- basis_bps_<ex>      = (price_<ex> / ref_price_usd - 1) * 1e4
+- div_bps_<a>_<b>     = (price_a - price_b) / mid(a, b) * 1e4
+- max_abs_div_bps     = largest |div_bps| over the available pairs
+
+A venue counts as quoting a symbol only if it has a price and
+volume_24h_usd > `--min-volume` (default 0): dead/delisted markets keep stale
+oracles and would otherwise dominate the divergence columns.
+Only symbols quoted on at least `--min-venues` venues are emitted.
+Blank prices (placeholders / failed collectors) are ignored; missing cells are "".
+"""
+import argparse, csv, json, os
+from typing import List, Dict
+
+import numpy as np
+
+from .common.schema import EXCHANGES, EXCHANGE_PAIRS, DIVERGENCE_FIELDS
+
+def read_columns(path: str) -> Dict[str, np.ndarray]:
+    with open(path, "r", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return {}
+    header, body = rows[0], rows[1:]
+    cols = np.array(body, dtype=str).reshape(len(body), len(header))
+    return {name: cols[:, i] for i, name in enumerate(header)}
+
+def to_float(col: np.ndarray) -> np.ndarray:
+    """String column → float64, blanks as NaN."""
+    col = np.char.strip(col.astype(str))
+    return np.where(col == "", "nan", col).astype(np.float64)
+
+def compute_divergence(exchange: np.ndarray, symbol: np.ndarray, price: np.ndarray,
+                       volume: np.ndarray, min_venues: int = 2,
+                       min_volume: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Align venues on symbol and compute reference prices, basis and pairwise divergence.
+    Inputs are parallel 1-D arrays (one entry per combined row).
+    """
+    ex = np.char.lower(np.char.strip(exchange.astype(str)))
+    sym = np.char.upper(np.char.strip(symbol.astype(str)))
+    venues = np.array(EXCHANGES)   # sorted, so searchsorted maps name → column
+    ex_idx = np.searchsorted(venues, ex).clip(0, len(venues) - 1)
+    ok = ((venues[ex_idx] == ex) & (sym != "") & np.isfinite(price) & (price > 0)
+          & (np.nan_to_num(volume, nan=0.0) > min_volume))
+
+    syms, sym_idx = np.unique(sym[ok], return_inverse=True)
+    P = np.full((len(syms), len(venues)), np.nan)
+    V = np.zeros((len(syms), len(venues)))
+    P[sym_idx, ex_idx[ok]] = price[ok]
+    V[sym_idx, ex_idx[ok]] = volume[ok]
+
+    have = np.isfinite(P)
+    n_venues = have.sum(axis=1)
+    keep = n_venues >= min_venues
+    syms, P, V, have, n_venues = syms[keep], P[keep], V[keep], have[keep], n_venues[keep]
+
+    Pz = np.where(have, P, 0.0)
+    W = np.where(have, V, 0.0)
+    wsum = W.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = (Pz * W).sum(axis=1) / wsum
+        mean = Pz.sum(axis=1) / n_venues
+        ref = np.where(wsum > 0, vwap, mean)
+
+        basis = (P / ref[:, None] - 1.0) * 1e4
+        ia = np.array([EXCHANGES.index(a) for a, _ in EXCHANGE_PAIRS], dtype=int)
+        ib = np.array([EXCHANGES.index(b) for _, b in EXCHANGE_PAIRS], dtype=int)
+        pa, pb = P[:, ia], P[:, ib]
+        div = (pa - pb) / ((pa + pb) / 2.0) * 1e4
+    max_abs = np.max(np.where(np.isfinite(div), np.abs(div), -np.inf), axis=1, initial=-np.inf)
+
+    return {
+        "symbol_raw": syms,
+        "venues": n_venues,
+        "ref_price_usd": ref,
+        "prices": P,
+        "basis_bps": basis,
+        "div_bps": div,
+        "max_abs_div_bps": np.where(np.isfinite(max_abs), max_abs, np.nan),
+    }
+
+def to_rows(res: Dict[str, np.ndarray], date_str: str) -> List[Dict]:
+    cols: Dict[str, List] = {
+        "symbol_raw": res["symbol_raw"].tolist(),
+        "venues": res["venues"].tolist(),
+        "ref_price_usd": res["ref_price_usd"].tolist(),
+        "max_abs_div_bps": np.round(res["max_abs_div_bps"], 2).tolist(),
+    }
+    basis = np.round(res["basis_bps"], 2) + 0.0   # + 0.0 folds -0.0 → 0.0
+    div = np.round(res["div_bps"], 2) + 0.0
+    for j, ex in enumerate(EXCHANGES):
+        cols[f"price_{ex}"] = res["prices"][:, j].tolist()
+        cols[f"basis_bps_{ex}"] = basis[:, j].tolist()
+    for j, (a, b) in enumerate(EXCHANGE_PAIRS):
+        cols[f"div_bps_{a}_{b}"] = div[:, j].tolist()
+
+    names = list(cols)
+    blank = lambda v: "" if isinstance(v, float) and v != v else v   # NaN → ""
+    rows = [dict(zip(names, map(blank, vals)), daily_snapshot=date_str) for vals in zip(*cols.values())]
+    return rows
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in-csv", required=True, help="Combined CSV from combine_daily")
+    ap.add_argument("--out-csv", required=True)
+    ap.add_argument("--out-json", default=None)
+    ap.add_argument("--daily-snapshot", required=True)
+    ap.add_argument("--min-venues", type=int, default=2)
+    ap.add_argument("--min-volume", type=float, default=0.0, help="venue counts only if volume_24h_usd > this")
+    args = ap.parse_args(argv)
+
+    cols = read_columns(args.in_csv)
+    if cols:
+        res = compute_divergence(cols["exchange"], cols["symbol_raw"], to_float(cols["price_usd"]),
+                                 to_float(cols["volume_24h_usd"]), min_venues=args.min_venues,
+                                 min_volume=args.min_volume)
+        rows = to_rows(res, args.daily_snapshot)
+    else:
+        rows = []
+
+    # CSV
+    os.makedirs(os.path.dirname(args.out_csv) or ".", exist_ok=True)
+    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=DIVERGENCE_FIELDS, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+
+    # JSON (optional)
+    if args.out_json:
+        with open(args.out_json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    print(f"[divergence] symbols={len(rows)} → {args.out_csv}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """
-Orchestrator: run collectors -> combine -> publish.
+Orchestrator: run collectors -> combine -> divergence -> publish.
 
 Usage:
   # daily snapshot (default)
@@ -11,6 +11,9 @@ Usage:
 
   # latest-only (hourly job): updates data/latest/ only
   python -m src.orchestrate --mode latest
+
+  # also collect per-market order-book depth (depth_1pct_usd)
+  python -m src.orchestrate --depth
 """
 import argparse, datetime as dt, os, subprocess, sys
 
@@ -26,6 +29,8 @@ def main(argv=None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--date", default=dt.datetime.utcnow().date().isoformat(), help="UTC date YYYY-MM-DD")
     ap.add_argument("--mode", choices=["daily", "latest"], default="daily", help="daily: write latest+daily+history; latest: write latest only")
+    ap.add_argument("--depth", action="store_true", help="also collect per-market order-book depth (HL + dYdX)")
+    ap.add_argument("--depth-deadline", type=float, default=120.0, help="seconds budget for the depth stage")
     args = ap.parse_args(argv)
 
     ymd = args.date.replace("-", "")
@@ -49,15 +54,32 @@ def main(argv=None) -> int:
          "--daily-snapshot", args.date,
          "--symbols-out", "symbol_registry/hyperliquid_symbols.json"])
 
+    # 1b) optional depth (top markets by volume first, bounded by deadline)
+    depth_json = os.path.join(staging, "depth_latest.json")
+    if args.depth:
+        run([sys.executable, "-m", "src.depth_collect",
+             "--hl",   os.path.join(staging, "hyperliquid_latest.json"),
+             "--dydx", os.path.join(staging, "dydx_latest.json"),
+             "--out",  depth_json,
+             "--daily-snapshot", args.date,
+             "--deadline", str(args.depth_deadline)])
+
     # 2) combine (placeholders kick in if any collector failed)
     run([sys.executable, "-m", "src.combine_daily",
          "--drift", os.path.join(staging, "drift_latest.json"),
          "--hl",    os.path.join(staging, "hyperliquid_latest.json"),
          "--dydx",  os.path.join(staging, "dydx_latest.json"),
+         *(["--depth", depth_json] if args.depth else []),
          "--out-csv",  os.path.join(staging, "all_latest.csv"),
          "--out-json", os.path.join(staging, "all_latest.json"),
          "--daily-snapshot", args.date])
 
+    # 2b) cross-venue price divergence (reads the combined CSV)
+    run([sys.executable, "-m", "src.divergence",
+         "--in-csv",  os.path.join(staging, "all_latest.csv"),
+         "--out-csv", os.path.join(staging, "divergence_latest.csv"),
+         "--daily-snapshot", args.date])
+
     # 3) publish (switch behavior by mode)
     run([sys.executable, "-m", "src.publish_artifacts",
          "--staging", staging,
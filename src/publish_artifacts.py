@@ -9,7 +9,7 @@ Modes:
 import argparse, os, shutil, csv
 from typing import List, Dict
 from .common.io_utils import ensure_dir, append_history_rows
-from .common.schema import CSV_FIELDS
+from .common.schema import CSV_FIELDS, DIVERGENCE_FIELDS
 
 def read_csv_rows(path: str) -> List[Dict]:
     rows = []
@@ -38,7 +38,8 @@ def main(argv=None) -> int:
         ensure_dir(hist_dir)
 
     # ---- always update data/latest/ ----
-    for name in ("drift_latest.json", "hyperliquid_latest.json", "dydx_latest.json", "all_latest.csv", "all_latest.json"):
+    for name in ("drift_latest.json", "hyperliquid_latest.json", "dydx_latest.json", "all_latest.csv", "all_latest.json",
+                 "divergence_latest.csv", "depth_latest.json"):
         src = os.path.join(args.staging, name)
         if os.path.exists(src):
             shutil.copyfile(src, os.path.join(latest_dir, name))
@@ -52,7 +53,9 @@ def main(argv=None) -> int:
         "drift_latest.json":        f"drift_{ymd}.json",
         "hyperliquid_latest.json":  f"hyperliquid_{ymd}.json",
         "dydx_latest.json":         f"dydx_{ymd}.json",
+        "depth_latest.json":        f"depth_{ymd}.json",
         "all_latest.csv":           f"all_{ymd}.csv",
+        "divergence_latest.csv":    f"divergence_{ymd}.csv",
     }
     for src_name, dst_name in mapping.items():
         src = os.path.join(args.staging, src_name)
@@ -65,6 +68,12 @@ def main(argv=None) -> int:
         rows = read_csv_rows(latest_csv)
         append_history_rows(hist_dir, snapshot_date=args.date, rows=rows)
 
+    div_csv = os.path.join(args.staging, "divergence_latest.csv")
+    if os.path.exists(div_csv):
+        rows = read_csv_rows(div_csv)
+        append_history_rows(hist_dir, snapshot_date=args.date, rows=rows,
+                            fields=DIVERGENCE_FIELDS, prefix="divergence")
+
     print("[publish] daily updated: latest/, daily_snapshots/, history/")
     return 0
 